@@ -1,8 +1,31 @@
 #!/usr/bin/env python3
 """Verify perf smoke voice metrics from log file."""
 
-import sys
+import mmap
 import pathlib
+import re
+import sys
+from typing import Optional
+
+MARKER = b"voice_metrics|"
+FIELD_RE = re.compile(rb"([a-z_]+)=([^|\r\n]*)")
+
+
+def read_latest_metrics_line(log_path: pathlib.Path) -> Optional[bytes]:
+    """Return the last line containing MARKER without loading the whole log."""
+    with open(log_path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            idx = mm.rfind(MARKER)
+            if idx < 0:
+                return None
+            end = mm.find(b"\n", idx)
+            if end < 0:
+                end = len(mm)
+            start = mm.rfind(b"\n", 0, idx) + 1
+            return mm[start:end].strip()
+
 
 def main():
     log_path = pathlib.Path(sys.argv[1])
@@ -10,21 +33,15 @@ def main():
     if not log_path.exists():
         sys.exit(f"Log file not found: {log_path}")
 
-    lines = [
-        line.strip()
-        for line in log_path.read_text().splitlines()
-        if "voice_metrics|" in line
-    ]
-
-    if not lines:
+    latest_bytes = read_latest_metrics_line(log_path)
+    if latest_bytes is None:
         sys.exit("No voice_metrics lines found")
 
-    latest = lines[-1]
-    parts = {}
-    for chunk in latest.split("|"):
-        if "=" in chunk:
-            key, value = chunk.split("=", 1)
-            parts[key] = value
+    latest = latest_bytes.decode("utf-8", errors="replace")
+    parts = {
+        key.decode(): value.decode("utf-8", errors="replace")
+        for key, value in FIELD_RE.findall(latest_bytes)
+    }
 
     def get_number(key: str) -> float:
         try:
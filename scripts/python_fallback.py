@@ -15,22 +15,103 @@ so frontends such as the Rust TUI or automated tests can run the pipeline
 non-interactively (`--auto-send --emit-json`) and treat this script as the
 canonical spec.
 """
-import argparse, errno, json, os, platform, pty, select, shlex, shutil, subprocess, sys, tempfile, time
+# Modules only some paths need (pty, termios, platform, tempfile, ...) are imported
+# where they are used to keep start-up fast and the import portable to Windows.
+import argparse, atexit, functools, json, math, os, select, shlex, shutil, signal, struct, subprocess, sys, threading, time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Callable, Optional
 
 # Extra Codex CLI flags injected via --codex-args/--codex-arg; stored globally for reuse.
 _EXTRA_CODEX_ARGS: list[str] = []
-
-def _require(cmd: str):
-    """Ensure a command is present on the PATH before dispatching a subprocess.
+# Whether stdout is a terminal, captured once by `main()`; None means check on each call.
+_STDOUT_IS_TTY: bool | None = None
+
+# Whether children can be started in (and killed as) their own session.
+_POSIX = os.name == "posix"
+# Seconds an interrupted child gets to exit on SIGINT before it is killed.
+_INTERRUPT_GRACE_S = 2.0
+
+# Codex invocation mode (attempt index, needs PTY) that last succeeded, keyed by
+# the base argv (resolved command + extra flags), so repeat calls in one process
+# skip the probing spawns.
+_CODEX_MODES: dict[tuple[str, ...], tuple[int, bool]] = {}
+
+# Maximum bytes taken from the PTY per read.
+_PTY_READ_SIZE = 65536
+# Cursor position query some CLIs send; answered with a fixed reply under the PTY.
+_CURSOR_QUERY = b"\x1b[6n"
+# Rows and columns reported to PTY children.
+_PTY_WINSIZE = (50, 200)
+
+@functools.cache
+def _resolved(cmd: str) -> str:
+    """Resolve a command to its absolute path, scanning PATH once per process.
+
+    Callers put the returned path straight into argv so neither Python nor the
+    kernel has to walk PATH again on retries. Call `_resolved.cache_clear()`
+    if PATH changes mid-process.
 
     Raises:
         RuntimeError: if the command cannot be found with `shutil.which`.
     """
-    if shutil.which(cmd) is None:
+    path = shutil.which(cmd)
+    if path is None:
         raise RuntimeError(f"Command not found on PATH: {cmd}")
+    return path
+
+@functools.cache
+def _sysname() -> str:
+    """Return `platform.system()`, looked up once since the OS cannot change mid-process."""
+    import platform
+    return platform.system()
+
+@functools.cache
+def _ram_tmp_dir() -> str | None:
+    """Return a RAM-backed directory for throwaway artifacts, or None for the default tmp dir.
+
+    A user-set `TMPDIR` always wins, and `/dev/shm` is only used when writable.
+    """
+    if os.environ.get("TMPDIR"):
+        return None
+    shm = "/dev/shm"
+    return shm if os.path.isdir(shm) and os.access(shm, os.W_OK) else None
+
+@functools.cache
+def _session_tmp() -> Path:
+    """Return a scratch directory shared by the whole process, removed at exit."""
+    import tempfile
+    try:
+        path = Path(tempfile.mkdtemp(prefix="voiceterm_", dir=_ram_tmp_dir()))
+    except OSError:
+        # A full or unusable RAM directory falls back to the default tmp dir.
+        path = Path(tempfile.mkdtemp(prefix="voiceterm_"))
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+def _kill_session(p: subprocess.Popen, *, graceful: bool = False) -> None:
+    """Kill `p` together with any processes it started in its session.
+
+    With `graceful`, the session first gets the SIGINT that Ctrl+C would have
+    delivered had it shared our process group, so tools such as ffmpeg can
+    restore terminal state; SIGKILL follows after a short grace period.
+    """
+    if not _POSIX:
+        p.kill()
+        return
+    if graceful:
+        try:
+            os.killpg(p.pid, signal.SIGINT)
+        except ProcessLookupError:
+            return
+        try:
+            p.wait(timeout=_INTERRUPT_GRACE_S)
+        except subprocess.TimeoutExpired:
+            pass
+    try:
+        os.killpg(p.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
 
 def _run(argv, *, input_bytes=None, timeout=None, cwd=None, env=None):
     """Execute a command and return its stdout bytes.
@@ -43,18 +124,27 @@ def _run(argv, *, input_bytes=None, timeout=None, cwd=None, env=None):
         cwd: Optional working directory override.
         env: Optional environment block for the child process.
 
+    On POSIX the child leads its own session, so a timeout or interrupt kills
+    everything it spawned rather than leaving orphans (e.g. ffmpeg) behind.
+
     Raises:
         RuntimeError: if the command times out or exits non-zero. The error
         includes stderr output so failures are easier to diagnose.
     """
     p = subprocess.Popen(argv, stdin=subprocess.PIPE if input_bytes else None,
-                         stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd, env=env)
+                         stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd, env=env,
+                         close_fds=True, start_new_session=_POSIX)
     try:
         out, err = p.communicate(input=input_bytes, timeout=timeout)
     except subprocess.TimeoutExpired:
-        p.kill()
+        _kill_session(p)
         out, err = p.communicate()
         raise RuntimeError(f"Timeout running: {' '.join(argv)}\n{err.decode(errors='ignore')}")
+    except BaseException:
+        # The child no longer shares our process group, so Ctrl+C must be forwarded by hand.
+        _kill_session(p, graceful=True)
+        p.wait()
+        raise
     if p.returncode != 0:
         raise RuntimeError(f"Nonzero exit {p.returncode}: {' '.join(argv)}\n{err.decode(errors='ignore')}")
     return out
@@ -66,10 +156,13 @@ def _run_with_pty(argv, *, input_bytes=None, timeout=None, env=None):
     non-interactive pipe. In those situations we fall back to a PTY so the CLI
     believes it is talking to a terminal.
     """
-    if platform.system() == "Windows":
+    if _sysname() == "Windows":
         raise RuntimeError("PTY fallback is not supported on Windows")
+    import errno, fcntl, pty, termios
 
     master_fd, slave_fd = pty.openpty()
+    # A wide window keeps Codex from wrapping lines and redrawing as often.
+    fcntl.ioctl(slave_fd, termios.TIOCSWINSZ, struct.pack("HHHH", *_PTY_WINSIZE, 0, 0))
     cursor_report = b"\x1b[1;1R"
     proc = None
     try:
@@ -88,75 +181,123 @@ def _run_with_pty(argv, *, input_bytes=None, timeout=None, env=None):
         if not data.endswith(b"\n"):
             data += b"\n"
         os.write(master_fd, data)
+    # Non-blocking reads let each wake-up drain everything that is buffered.
+    os.set_blocking(master_fd, False)
 
-    out = bytearray()
+    chunks: list[bytes] = []
     start = time.monotonic()
 
     def _read_chunk():
+        """Return the next PTY chunk, b"" once the slave is gone, or None when
+        nothing is buffered right now."""
         try:
-            return os.read(master_fd, 1024)
+            return os.read(master_fd, _PTY_READ_SIZE)
+        except BlockingIOError:
+            return None
         except OSError as e:
             if e.errno == errno.EIO:
                 return b""
             raise
 
+    def _collect(chunk):
+        # One scan finds every cursor query and all replies go out in one write.
+        # Chunks without a query are kept as-is; otherwise only the text around
+        # the queries is sliced out.
+        idx = chunk.find(_CURSOR_QUERY)
+        if idx < 0:
+            chunks.append(chunk)
+            return
+        pos = 0
+        replies = 0
+        while idx >= 0:
+            if idx > pos:
+                chunks.append(chunk[pos:idx])
+            replies += 1
+            pos = idx + len(_CURSOR_QUERY)
+            idx = chunk.find(_CURSOR_QUERY, pos)
+        os.write(master_fd, cursor_report * replies)
+        if pos < len(chunk):
+            chunks.append(chunk[pos:])
+
+    # On Linux a pidfd turns child exit into a poll event. Elsewhere we keep
+    # select() with a 100 ms `proc.poll()` check: macOS poll() does not support
+    # devices and reports a PTY master as POLLNVAL.
+    pidfd = None
+    if hasattr(os, "pidfd_open"):
+        try:
+            pidfd = os.pidfd_open(proc.pid)
+        except OSError:
+            pidfd = None
+    poller = None
+    if pidfd is not None:
+        poller = select.poll()
+        poller.register(master_fd, select.POLLIN)
+        poller.register(pidfd, select.POLLIN)
+    master_open = True
+
+    def _drain(hangup=False):
+        nonlocal master_open
+        while chunk := _read_chunk():
+            _collect(chunk)
+        if chunk == b"" or hangup:
+            # Every slave handle is closed; only the exit is left to wait for.
+            master_open = False
+            if poller is not None:
+                poller.unregister(master_fd)
+
     try:
-        while True:
+        exited = False
+        while not exited:
+            wait = None if poller is not None else 0.1
             if timeout is not None:
-                elapsed = time.monotonic() - start
-                remaining = timeout - elapsed
+                remaining = timeout - (time.monotonic() - start)
                 if remaining <= 0:
                     proc.kill()
                     proc.wait()
                     raise RuntimeError(f"Timeout running (PTY): {' '.join(argv)}")
-                wait = max(0.0, min(0.1, remaining))
-            else:
-                wait = 0.1
-
-            r, _, _ = select.select([master_fd], [], [], wait)
-            if master_fd in r:
-                chunk = _read_chunk()
-                if chunk:
-                    if b"\x1b[6n" in chunk:
-                        chunk = chunk.replace(b"\x1b[6n", b"")
-                        os.write(master_fd, cursor_report)
-                    if chunk:
-                        out.extend(chunk)
-                elif proc.poll() is not None:
-                    break
-            if proc.poll() is not None:
-                while True:
-                    chunk = _read_chunk()
-                    if not chunk:
-                        break
-                    if b"\x1b[6n" in chunk:
-                        chunk = chunk.replace(b"\x1b[6n", b"")
-                        os.write(master_fd, cursor_report)
-                    if chunk:
-                        out.extend(chunk)
-                break
+                wait = remaining if wait is None else min(wait, remaining)
+
+            if poller is None:
+                ready, _, _ = select.select([master_fd] if master_open else [], [], [], wait)
+                if ready:
+                    _drain()
+                exited = proc.poll() is not None
+                continue
+
+            for fd, mask in poller.poll(None if wait is None else math.ceil(wait * 1000)):
+                if fd == pidfd:
+                    exited = True
+                elif mask & select.POLLNVAL:
+                    proc.kill()
+                    proc.wait()
+                    raise RuntimeError(f"PTY master became invalid: {' '.join(argv)}")
+                else:
+                    # POLLHUP/POLLERR without EIO would otherwise wake us forever.
+                    _drain(hangup=bool(mask & (select.POLLHUP | select.POLLERR)))
+
+        proc.wait()
+        while chunk := _read_chunk():
+            _collect(chunk)
     finally:
+        if pidfd is not None:
+            os.close(pidfd)
         os.close(master_fd)
 
+    out = b"".join(chunks)
     if proc.returncode != 0:
         raise RuntimeError(f"Nonzero exit {proc.returncode} (PTY): {' '.join(argv)}\n{out.decode('utf-8', errors='ignore')}")
-    return bytes(out)
+    return out
 
 def _is_tty_error(error: Exception) -> bool:
     """Return True when the exception text suggests a missing TTY."""
     msg = str(error).lower()
     return "stdout is not a terminal" in msg or "isatty" in msg or "not a tty" in msg
 
-def record_wav(path: str, seconds: int, ffmpeg_cmd: str, ffmpeg_device: str|None=None) -> None:
-    """Capture microphone input to a mono, 16 kHz WAV file via ffmpeg.
-
-    The function chooses reasonable defaults for each operating system so the
-    caller rarely needs to know the exact device names. When defaults do not
-    work the optional `ffmpeg_device` argument allows full override.
-    """
-    _require(ffmpeg_cmd)
-    sysname = platform.system()
-    args = [ffmpeg_cmd, "-y"]
+def _ffmpeg_input_args(ffmpeg_cmd: str, ffmpeg_device: str|None) -> list[str]:
+    """Return the ffmpeg argv prefix that opens the default microphone for this OS."""
+    sysname = _sysname()
+    # -nostdin: ffmpeg must never read (or reconfigure) the user's terminal.
+    args = [_resolved(ffmpeg_cmd), "-y", "-nostdin"]
     if sysname == "Darwin":
         # list devices: ffmpeg -f avfoundation -list_devices true -i ""
         dev = ffmpeg_device if ffmpeg_device else ":0"
@@ -171,125 +312,258 @@ def record_wav(path: str, seconds: int, ffmpeg_cmd: str, ffmpeg_device: str|None
         args += ["-f", "dshow", "-i", dev]
     else:
         raise RuntimeError(f"Unsupported OS: {sysname}")
+    return args
+
+def record_wav(path: str, seconds: int, ffmpeg_cmd: str, ffmpeg_device: str|None=None) -> None:
+    """Capture microphone input to a mono, 16 kHz WAV file via ffmpeg.
+
+    The function chooses reasonable defaults for each operating system so the
+    caller rarely needs to know the exact device names. When defaults do not
+    work the optional `ffmpeg_device` argument allows full override.
+    """
+    args = _ffmpeg_input_args(ffmpeg_cmd, ffmpeg_device)
     args += ["-t", str(seconds), "-ac", "1", "-ar", "16000", "-vn", path]
     _run(args)
 
-def transcribe(path: str, whisper_cmd: str, lang: str, model: str, *, model_path: str|None=None, tmpdir: Path|None=None) -> tuple[str, Path]:
+def capture_to_memory(seconds: int, ffmpeg_cmd: str, ffmpeg_device: str|None=None) -> bytes:
+    """Capture microphone input and return it as mono 16 kHz WAV bytes.
+
+    This is `record_wav` without the disk round-trip; ffmpeg writes the WAV to
+    a pipe just as `record_stream` does. Pass the result to
+    `transcribe(..., wav_bytes=...)`.
+    """
+    args = _ffmpeg_input_args(ffmpeg_cmd, ffmpeg_device)
+    args += ["-t", str(seconds), "-ac", "1", "-ar", "16000", "-vn", "-f", "wav", "pipe:1"]
+    return _run(args)
+
+def record_stream(seconds: int, ffmpeg_cmd: str, ffmpeg_device: str|None=None) -> subprocess.Popen:
+    """Start capturing microphone input as a mono, 16 kHz WAV stream on stdout.
+
+    Unlike `record_wav` this returns immediately with the running ffmpeg
+    process so `transcribe(..., audio_stream=proc)` can consume audio while it
+    is still being recorded. The caller owns the process.
+    """
+    args = _ffmpeg_input_args(ffmpeg_cmd, ffmpeg_device)
+    args += ["-t", str(seconds), "-ac", "1", "-ar", "16000", "-vn", "-f", "wav", "pipe:1"]
+    # Same session handling as `_run`, so the caller can stop ffmpeg with `_kill_session`.
+    return subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            close_fds=True, start_new_session=_POSIX)
+
+def _run_piped(producer: subprocess.Popen, argv, *, timeout=None):
+    """Run `argv` with the producer's stdout as its stdin and return its stdout bytes.
+
+    Both processes' output pipes are drained while they run (the producer's
+    stderr on a helper thread), so verbose logging cannot stall either side.
+    As in `_run`, a timeout or interrupt stops both process sessions.
+
+    Raises:
+        RuntimeError: if either process exits non-zero or the pair exceeds
+        `timeout` seconds. A consumer failure is reported first since it also
+        breaks the producer's pipe.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    p = subprocess.Popen(argv, stdin=producer.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                         close_fds=True, start_new_session=_POSIX)
+    # Drop our copy of the pipe so the consumer sees EOF when the producer exits.
+    producer.stdout.close()
+    producer_err = bytearray()
+    reader = threading.Thread(target=lambda: producer_err.extend(producer.stderr.read()), daemon=True)
+    reader.start()
+    try:
+        out, err = p.communicate(timeout=timeout)
+        producer.wait(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+    except subprocess.TimeoutExpired:
+        _kill_session(p)
+        _kill_session(producer)
+        p.communicate()
+        producer.wait()
+        raise RuntimeError(f"Timeout running: {' '.join(producer.args)} | {' '.join(argv)}")
+    except BaseException:
+        _kill_session(p, graceful=True)
+        _kill_session(producer, graceful=True)
+        p.wait()
+        producer.wait()
+        raise
+    finally:
+        reader.join()
+
+    errors = []
+    if p.returncode != 0:
+        errors.append(f"Nonzero exit {p.returncode}: {' '.join(argv)}\n{err.decode(errors='ignore')}")
+    if producer.returncode != 0:
+        errors.append(f"Nonzero exit {producer.returncode}: {' '.join(producer.args)}\n{producer_err.decode(errors='ignore')}")
+    if errors:
+        raise RuntimeError("\n---\n".join(errors))
+    return out
+
+def _build_openai_args(whisper_path: str, source: str, lang: str, model: str, model_path: str|None, base: Path) -> tuple[list[str], Path]:
+    """Return argv and transcript path for the OpenAI whisper CLI."""
+    if source == "-":
+        raise RuntimeError("In-memory transcription requires whisper.cpp; the whisper CLI needs a file")
+    # Writes <source stem>.txt into output_dir
+    out_dir = base.parent
+    args = [whisper_path, source, "--model", model, "--output_format", "txt", "--output_dir", str(out_dir)]
+    if lang != "auto":
+        args += ["--language", lang]
+    return args, out_dir / (Path(source).stem + ".txt")
+
+def _build_whispercpp_args(whisper_path: str, source: str, lang: str, model: str, model_path: str|None, base: Path) -> tuple[list[str], Path]:
+    """Return argv and transcript path for a whisper.cpp binary (`source` may be "-" for stdin)."""
+    if not model_path:
+        raise RuntimeError("whisper.cpp requires --whisper-model-path to a ggml*.bin file")
+    args = [whisper_path, "-m", model_path, "-f", source, "-otxt", "-of", str(base), "-l", lang]
+    return args, Path(str(base) + ".txt")
+
+@functools.cache
+def _whisper_flavor(whisper_cmd: str) -> Callable[..., tuple[list[str], Path]]:
+    """Pick the argv builder for `whisper_cmd` once per command.
+
+    Executables named `whisper*` are the OpenAI CLI; anything else is treated
+    as whisper.cpp.
+    """
+    exe = Path(whisper_cmd).name.lower()
+    if "whisper" == exe or exe.startswith("whisper"):
+        return _build_openai_args
+    return _build_whispercpp_args
+
+def transcribe(path: str, whisper_cmd: str, lang: str, model: str, *, model_path: str|None=None, tmpdir: Path|None=None,
+               audio_stream: subprocess.Popen|None=None, wav_bytes: bytes|None=None, timeout: float|None=None) -> tuple[str, Path]:
     """Convert recorded audio into text using the selected Whisper implementation.
 
     This helper accepts both the official OpenAI CLI (`whisper`) and the
     whisper.cpp binary, mirroring the flags required by each tool. Temporary
-    files are written into a per-invocation directory so that multiple runs
-    never collide.
+    files are written into `tmpdir`. When it is omitted, each call works in its
+    own subdirectory of a shared per-process directory, which is removed once
+    the transcript has been read, so the returned path no longer exists.
+    When `audio_stream` is a process from `record_stream`, whisper.cpp reads
+    its stdout directly (`path` is ignored) so model loading overlaps the
+    recording. Likewise `wav_bytes` from `capture_to_memory` is piped to
+    whisper.cpp's stdin instead of reading `path` from disk. The OpenAI CLI
+    needs a file and rejects both. `timeout` bounds the whisper run (including
+    the recording it overlaps when streaming).
     Returns:
         A tuple of the transcript text and the path to the generated `.txt` file.
     """
-    _require(whisper_cmd)
-    tmpdir = Path(tmpdir or tempfile.mkdtemp(prefix="voiceterm_"))
-    base = tmpdir / "transcript"
-    exe = Path(whisper_cmd).name.lower()
+    whisper_path = _resolved(whisper_cmd)
+    shared = tmpdir is None
+    if shared:
+        # A unique subdirectory keeps concurrent calls from colliding in the shared one.
+        tmpdir = _session_tmp() / f"transcript_{os.urandom(4).hex()}"
+        tmpdir.mkdir()
+    base = Path(tmpdir) / "transcript"
+    source = "-" if audio_stream is not None or wav_bytes is not None else path
 
-    lang = lang.strip().lower()
-    use_auto = lang == "auto"
-
-    if "whisper" == exe or exe.startswith("whisper"):
-        # OpenAI whisper CLI
-        # Writes <basename>.txt into output_dir
-        out_dir = tmpdir
-        args = [whisper_cmd, path, "--model", model, "--output_format", "txt", "--output_dir", str(out_dir)]
-        if not use_auto:
-            args += ["--language", lang]
-        _run(args)
-        txt_path = out_dir / (Path(path).stem + ".txt")
-    else:
-        # whisper.cpp style
-        if not model_path:
-            raise RuntimeError("whisper.cpp requires --whisper-model-path to a ggml*.bin file")
-        args = [whisper_cmd, "-m", model_path, "-f", path, "-otxt", "-of", str(base)]
-        if use_auto:
-            args += ["-l", "auto"]
+    try:
+        args, txt_path = _whisper_flavor(whisper_cmd)(whisper_path, source, lang.strip().lower(), model, model_path, base)
+        if audio_stream is not None:
+            _run_piped(audio_stream, args, timeout=timeout)
+        elif wav_bytes is not None:
+            _run(args, input_bytes=wav_bytes, timeout=timeout)
         else:
-            args += ["-l", lang]
-        _run(args)
-        txt_path = Path(str(base) + ".txt")
+            _run(args, timeout=timeout)
 
-    if not txt_path.exists():
-        raise RuntimeError(f"Transcript file not found: {txt_path}")
-    return txt_path.read_text(encoding="utf-8").strip(), txt_path
+        if not txt_path.exists():
+            raise RuntimeError(f"Transcript file not found: {txt_path}")
+        return txt_path.read_text(encoding="utf-8").strip(), txt_path
+    finally:
+        if shared:
+            shutil.rmtree(tmpdir, ignore_errors=True)
 
-def call_codex_auto(prompt: str, codex_cmd: str, *, timeout: int | None = None) -> str | None:
+def call_codex_auto(prompt: str, codex_cmd: str, *, timeout: int | None = None, decode_output: bool = False) -> bytes | str | None:
     """Invoke the Codex CLI and gracefully fallback across invocation modes.
 
     The function first tries to run Codex in "argument mode" (passing the prompt
     as a positional argument) and, if that fails, switches to piping the prompt
     via stdin. When Codex refuses to run without a TTY we emulate one using a
-    pseudo-terminal so the same behavior works inside scripts and tests. Any
+    pseudo-terminal so the same behavior works inside scripts and tests; after
+    the first refusal the remaining modes start under the PTY directly, and the
+    mode that succeeds is remembered for later calls in the same process. Any
     extra Codex flags supplied via `--codex-args` are threaded through every
     attempt.
 
     Returns:
-        Either the captured stdout text (when running in a non-interactive
-        environment) or None if Codex wrote directly to the parent TTY.
+        Either the captured stdout bytes (when running in a non-interactive
+        environment; text when `decode_output` is set) or None if Codex wrote
+        directly to the parent TTY.
     """
-    _require(codex_cmd)
+    codex_cmd = _resolved(codex_cmd)
+    # Encode once; every stdin attempt sends the same newline-terminated bytes.
     prompt_bytes = prompt.encode("utf-8")
+    if not prompt_bytes.endswith(b"\n"):
+        prompt_bytes += b"\n"
     error_messages: list[str] = []
 
     # Allow higher-level wrappers (like the Rust TUI) to inject extra Codex CLI flags.
-    extra_args = list(_EXTRA_CODEX_ARGS)
-    env = os.environ.copy()
-    env.setdefault("TERM", env.get("TERM", "xterm-256color"))
+    # The immutable base argv is shared by every attempt, so none can leak changes into another.
+    base = (codex_cmd, *_EXTRA_CODEX_ARGS)
+    # Only build a new environment when TERM needs filling in; None inherits ours.
+    env = None if os.environ.get("TERM") else {**os.environ, "TERM": "xterm-256color"}
 
-    if sys.stdout.isatty():
+    stdout_is_tty = sys.stdout.isatty() if _STDOUT_IS_TTY is None else _STDOUT_IS_TTY
+    if stdout_is_tty:
         # Fast path: when the parent is an interactive shell prefer streaming output
         # directly so Codex can render progress/UI elements untouched.
-        cmd1 = [codex_cmd, *extra_args, prompt]
+        cmd1 = base + (prompt,)
         result = subprocess.run(
             cmd1,
             check=False,
             stderr=subprocess.PIPE,
-            text=True,
             env=env,
         )
         if result.returncode == 0:
             return None
         error_messages.append(
-            f"Arg mode exit {result.returncode}: {' '.join(cmd1)}\n{(result.stderr or '').strip()}"
+            f"Arg mode exit {result.returncode}: {' '.join(cmd1)}\n{result.stderr.decode('utf-8', errors='ignore').strip()}"
         )
 
-        input_text = prompt if prompt.endswith("\n") else prompt + "\n"
-        cmd2 = [codex_cmd, *extra_args]
+        cmd2 = base
         result = subprocess.run(
             cmd2,
-            input=input_text,
+            input=prompt_bytes,
             check=False,
             stderr=subprocess.PIPE,
-            text=True,
             env=env,
         )
         if result.returncode == 0:
             return None
         error_messages.append(
-            f"Stdin mode exit {result.returncode}: {' '.join(cmd2)}\n{(result.stderr or '').strip()}"
+            f"Stdin mode exit {result.returncode}: {' '.join(cmd2)}\n{result.stderr.decode('utf-8', errors='ignore').strip()}"
         )
 
-    attempts = [
-        ([codex_cmd, *extra_args, prompt], {}),
-        ([codex_cmd, *extra_args], {"input_bytes": prompt_bytes}),
-    ]
+    # (argv, stdin payload): argument mode first, then the prompt on stdin.
+    attempts = (
+        (base + (prompt,), None),
+        (base, prompt_bytes),
+    )
 
-    for argv, extra in attempts:
+    # Start with the mode that worked last time, then probe the rest in order.
+    known = _CODEX_MODES.get(base)
+    order = list(range(len(attempts)))
+    if known is not None:
+        order.remove(known[0])
+        order.insert(0, known[0])
+    # Once Codex has refused a non-TTY stdout, every later plain spawn would
+    # fail the same way, so go straight to the PTY for the remaining modes.
+    needs_pty = known is not None and known[1]
+
+    for index in order:
+        argv, payload = attempts[index]
+        if not needs_pty:
+            try:
+                out = _run(argv, input_bytes=payload, timeout=timeout, env=env)
+                _CODEX_MODES[base] = (index, False)
+                return out.decode("utf-8", errors="ignore") if decode_output else out
+            except RuntimeError as exc:
+                error_messages.append(str(exc))
+                if not _is_tty_error(exc) or _sysname() == "Windows":
+                    continue
+                needs_pty = True
         try:
-            out = _run(argv, timeout=timeout, env=env, **extra)
-            return out.decode("utf-8", errors="ignore")
-        except RuntimeError as exc:
-            error_messages.append(str(exc))
-            if _is_tty_error(exc) and platform.system() != "Windows":
-                try:
-                    out = _run_with_pty(argv, timeout=timeout, env=env, **extra)
-                    return out.decode("utf-8", errors="ignore")
-                except Exception as pty_exc:
-                    error_messages.append(f"PTY fallback failed: {pty_exc}")
+            out = _run_with_pty(argv, input_bytes=payload, timeout=timeout, env=env)
+            _CODEX_MODES[base] = (index, True)
+            return out.decode("utf-8", errors="ignore") if decode_output else out
+        except Exception as pty_exc:
+            error_messages.append(f"PTY fallback failed: {pty_exc}")
 
     joined = "\n---\n".join(error_messages)
     raise RuntimeError(f"Codex invocation failed:\n{joined}")
@@ -310,6 +584,7 @@ class PipelineConfig:
     codex_timeout: int | None = 180
     keep_audio: bool = False
     run_codex: bool = True
+    stream: bool = False
 
 
 @dataclass
@@ -339,7 +614,7 @@ class PipelineResult:
 
     transcript: str
     prompt: str
-    codex_output: str | None
+    codex_output: bytes | None
     metrics: dict[str, float]
     audio_path: str | None
     transcript_path: str | None
@@ -350,7 +625,7 @@ class PipelineResult:
         return {
             "transcript": self.transcript,
             "prompt": self.prompt,
-            "codex_output": self.codex_output,
+            "codex_output": None if self.codex_output is None else self.codex_output.decode("utf-8", errors="ignore"),
             "metrics": self.metrics,
             "artifacts_retained": self.artifacts_retained,
             "paths": {
@@ -362,10 +637,15 @@ class PipelineResult:
 
 def _prepare_tmp_dir(keep_audio: bool) -> tuple[Path, bool, Callable[[], None]]:
     """Return a temporary directory, a retention flag, and a cleanup callback."""
+    import tempfile
     if keep_audio:
         path = Path(tempfile.mkdtemp(prefix="voiceterm_"))
         return path, True, lambda: None
-    tmp = tempfile.TemporaryDirectory(prefix="voiceterm_")
+    # Throwaway artifacts go to RAM-backed storage when the OS provides it.
+    try:
+        tmp = tempfile.TemporaryDirectory(prefix="voiceterm_", dir=_ram_tmp_dir())
+    except OSError:
+        tmp = tempfile.TemporaryDirectory(prefix="voiceterm_")
     path = Path(tmp.name)
 
     def _cleanup():
@@ -379,18 +659,36 @@ def capture_transcript(config: PipelineConfig) -> CaptureArtifacts:
     tmp_dir, retained, cleanup_cb = _prepare_tmp_dir(config.keep_audio)
     try:
         wav = tmp_dir / "audio.wav"
+        use_cpp = _whisper_flavor(config.whisper_cmd) is _build_whispercpp_args
+        stream = wav_bytes = None
         t0 = time.monotonic()
-        record_wav(str(wav), config.seconds, config.ffmpeg_cmd, config.ffmpeg_device)
+        if config.stream and use_cpp:
+            stream = record_stream(config.seconds, config.ffmpeg_cmd, config.ffmpeg_device)
+        elif use_cpp and not config.keep_audio:
+            # Nothing asked to keep the WAV, so hand whisper.cpp the audio in memory.
+            wav_bytes = capture_to_memory(config.seconds, config.ffmpeg_cmd, config.ffmpeg_device)
+        else:
+            record_wav(str(wav), config.seconds, config.ffmpeg_cmd, config.ffmpeg_device)
         t1 = time.monotonic()
-        transcript_text, transcript_path = transcribe(
-            str(wav),
-            config.whisper_cmd,
-            config.lang,
-            config.whisper_model,
-            model_path=config.whisper_model_path,
-            tmpdir=tmp_dir,
-        )
+        try:
+            transcript_text, transcript_path = transcribe(
+                str(wav),
+                config.whisper_cmd,
+                config.lang,
+                config.whisper_model,
+                model_path=config.whisper_model_path,
+                tmpdir=tmp_dir,
+                audio_stream=stream,
+                wav_bytes=wav_bytes,
+            )
+        finally:
+            if stream is not None and stream.poll() is None:
+                _kill_session(stream)
+                stream.wait()
         t2 = time.monotonic()
+        if stream is not None:
+            # Recording and STT overlap, so the whole span is reported as record_s.
+            t1 = t2
         metrics = {
             "record_s": round(t1 - t0, 3),
             "stt_s": round(t2 - t1, 3),
@@ -413,7 +711,7 @@ def finalize_pipeline(artifacts: CaptureArtifacts, config: PipelineConfig, promp
     """Send the chosen prompt to Codex (when enabled) and build a result."""
     prompt = prompt_override if prompt_override is not None else artifacts.transcript
     metrics = dict(artifacts.metrics)
-    codex_out: str | None = None
+    codex_out: bytes | None = None
     codex_duration = 0.0
     if config.run_codex and prompt:
         codex_start = time.monotonic()
@@ -421,7 +719,8 @@ def finalize_pipeline(artifacts: CaptureArtifacts, config: PipelineConfig, promp
         codex_duration = time.monotonic() - codex_start
     metrics["codex_s"] = round(codex_duration, 3)
     metrics["total_s"] = round(metrics["record_s"] + metrics["stt_s"] + metrics["codex_s"], 3)
-    audio_path = str(artifacts.wav_path) if artifacts.artifacts_retained else None
+    # Streaming runs never write the WAV file, so only report audio that exists.
+    audio_path = str(artifacts.wav_path) if artifacts.artifacts_retained and artifacts.wav_path.exists() else None
     transcript_path = str(artifacts.transcript_path) if artifacts.artifacts_retained and artifacts.transcript_path else None
     return PipelineResult(
         transcript=artifacts.transcript,
@@ -471,9 +770,14 @@ def main():
     ap.add_argument("--emit-json", action="store_true", help="print a machine-readable JSON summary (suppresses interactive prompts)")
     ap.add_argument("--no-codex", action="store_true", help="stop after transcription instead of calling Codex")
     ap.add_argument("--codex-timeout", type=int, default=180, help="timeout (seconds) for Codex invocations")
+    ap.add_argument("--stream", action="store_true", help="pipe ffmpeg audio straight into whisper.cpp so transcription overlaps recording")
     args = ap.parse_args()
+    if args.stream and _whisper_flavor(args.whisper_cmd) is not _build_whispercpp_args:
+        ap.error("--stream requires a whisper.cpp binary for --whisper-cmd")
 
-    global _EXTRA_CODEX_ARGS
+    global _EXTRA_CODEX_ARGS, _STDOUT_IS_TTY
+    # The CLI never swaps stdout, so helpers can reuse a single isatty() answer.
+    _STDOUT_IS_TTY = sys.stdout.isatty()
     # Persist additional Codex flags so helper functions can reuse them.
     _EXTRA_CODEX_ARGS = []
     if getattr(args, "codex_args", None):
@@ -493,6 +797,7 @@ def main():
         codex_timeout=args.codex_timeout,
         keep_audio=args.keep_audio,
         run_codex=not args.no_codex,
+        stream=args.stream,
     )
 
     if args.emit_json or args.auto_send or args.no_codex:
@@ -505,6 +810,7 @@ def main():
         return
 
     # Interactive flow: capture once, allow manual edits, then send.
+    pool = None
     artifacts = capture_transcript(config)
     try:
         print("\n[Transcript]")
@@ -520,18 +826,19 @@ def main():
             sys.stdout.flush()
 
         result = finalize_pipeline(artifacts, config, prompt_override=prompt)
+        if args.say_ready and _sysname() == "Darwin":
+            # Offer audible feedback on macOS while output is printed and temp
+            # files are removed; failures are ignored since the result is never read.
+            import concurrent.futures
+            pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            pool.submit(_run, ["say", "Codex result ready"])
         if config.run_codex and result.codex_output is not None:
-            print(result.codex_output)
+            _write_output(result.codex_output)
         _print_human_summary(result, repeat_transcript=False, include_buffer=False)
     finally:
         artifacts.cleanup()
-
-    if args.say_ready and platform.system() == "Darwin":
-        # Offer audible feedback when the command completes on macOS.
-        try:
-            _run(["say", "Codex result ready"])
-        except Exception:
-            pass
+        if pool is not None:
+            pool.shutdown()
 
 
 def _print_human_summary(result: PipelineResult, *, repeat_transcript: bool = True, include_buffer: bool = True) -> None:
@@ -542,10 +849,18 @@ def _print_human_summary(result: PipelineResult, *, repeat_transcript: bool = Tr
 
     if include_buffer and result.codex_output is not None:
         print("\n[Codex output]")
-        print(result.codex_output)
+        _write_output(result.codex_output)
 
     print("\n[Latency]", json.dumps(result.metrics))
 
+
+def _write_output(data: bytes) -> None:
+    """Print raw Codex output bytes plus a newline without a decode/encode round-trip."""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(data)
+    sys.stdout.buffer.write(b"\n")
+    sys.stdout.buffer.flush()
+
 if __name__ == "__main__":
     try:
         main()